@@ -4,15 +4,23 @@ Coordinates web automation, screenshot capture, and presentation generation.
 """
 
 import os
+import queue
+import atexit
 import logging
+import logging.handlers
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import List, Dict, Any
 from pathlib import Path
 
 from config_manager import ConfigManager
-from web_automation import WebAutomation
-from presentation_generator import PresentationGenerator
+
+# Directories the bot writes into
+_REQUIRED_DIRS = ('screenshots', 'output')
+
+# Process-wide log listener; shared by every CaptureBot and stopped at exit
+_log_listener = None
 
 
 class CaptureBot:
@@ -25,6 +33,8 @@ class CaptureBot:
         self.web_automation = None
         self.presentation_generator = None
         self.screenshots = []
+        # Background writer for screenshot PNG bytes
+        self._io_executor = ThreadPoolExecutor(max_workers=2)
         
         # Set up logging
         self._setup_logging()
@@ -35,20 +45,34 @@ class CaptureBot:
     
     def _setup_logging(self) -> None:
         """Set up logging configuration."""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('capture_bot.log'),
-                logging.StreamHandler()
-            ]
+        global _log_listener
+        if logging.getLogger().handlers:
+            # Logging already configured, same as logging.basicConfig()
+            return
+        
+        # Handlers run on a listener thread so the step loop never blocks on log I/O
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler('capture_bot.log')
+        stream_handler = logging.StreamHandler()
+        file_handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
+        
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        # Leave the real formatting to the listener's handlers
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+        _log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, stream_handler, respect_handler_level=True
         )
+        _log_listener.start()
+        # The listener thread is a daemon; drain it at exit even if cleanup() is never called
+        atexit.register(_log_listener.stop)
     
     def _create_directories(self) -> None:
         """Create necessary directories."""
-        directories = ['screenshots', 'output']
-        for directory in directories:
-            Path(directory).mkdir(exist_ok=True)
+        for directory in _REQUIRED_DIRS:
+            os.makedirs(directory, exist_ok=True)
     
     def validate_configuration(self) -> bool:
         """Validate the configuration and return True if valid."""
@@ -65,6 +89,10 @@ class CaptureBot:
     
     def initialize_components(self) -> None:
         """Initialize web automation and presentation generator."""
+        # Imported here so dry runs and --help never load Selenium or python-pptx
+        from web_automation import WebAutomation
+        from presentation_generator import PresentationGenerator
+        
         try:
             self.web_automation = WebAutomation(self.config)
             self.presentation_generator = PresentationGenerator(self.config)
@@ -74,7 +102,12 @@ class CaptureBot:
             raise
     
     def execute_user_flow(self) -> List[str]:
-        """Execute the user flow and capture screenshots."""
+        """Execute the user flow and capture screenshots.
+        
+        Browser actions run in order on the calling thread, since each step
+        depends on the page state left by the previous one. Screenshot PNGs are
+        written to disk on a background thread while the next step runs.
+        """
         if not self.web_automation:
             raise ValueError("Web automation not initialized")
         
@@ -87,22 +120,36 @@ class CaptureBot:
             # Get steps from configuration
             steps = self.config_manager.get_steps()
             screenshots = []
+            pending_writes = []
+            
+            # One timestamp per run; the step index keeps filenames unique
+            run_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             # Execute each step and take screenshots
+            total = len(steps)
             for i, step in enumerate(steps, 1):
                 step_name = step.get('name', f'Step {i}')
-                self.logger.info(f"Executing step {i}/{len(steps)}: {step_name}")
                 
                 # Execute the step
                 self.web_automation.execute_step(step)
                 
                 # Take screenshot
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_filename = f"step_{i:02d}_{step_name.replace(' ', '_').lower()}_{timestamp}.png"
-                screenshot_path = self.web_automation.take_screenshot(screenshot_filename)
+                slug = self.config_manager.get_step_slug(step.get('name')) or f'step_{i}'
+                screenshot_filename = f"step_{i:02d}_{slug}_{run_ts}.png"
+                screenshot_path, png = self.web_automation.capture_screenshot(screenshot_filename)
+                # Write to disk in the background while the next step runs
+                pending_writes.append(
+                    self._io_executor.submit(Path(screenshot_path).write_bytes, png)
+                )
                 screenshots.append(screenshot_path)
                 
-                self.logger.info(f"Screenshot captured: {screenshot_path}")
+                # One record per step; failures are logged by execute_step itself
+                self.logger.info("step=%d/%d name=%s screenshot=%s", i, total, step_name, screenshot_path)
+            
+            # Make sure every screenshot is on disk before reporting success
+            wait(pending_writes)
+            for future in pending_writes:
+                future.result()
             
             self.screenshots = screenshots
             self.logger.info(f"User flow completed. Captured {len(screenshots)} screenshots")
@@ -183,10 +230,7 @@ class CaptureBot:
             if not self.validate_configuration():
                 raise ValueError("Configuration validation failed")
             
-            # Initialize components (without starting browser)
-            self.presentation_generator = PresentationGenerator(self.config)
-            
-            # Check if we can access the presentation generator
+            # No browser or presentation is needed to list the steps
             steps = self.config_manager.get_steps()
             self.logger.info(f"Configuration valid. Found {len(steps)} steps to execute:")
             
@@ -206,6 +250,9 @@ class CaptureBot:
             if self.web_automation:
                 self.web_automation.close()
             
+            # Flush any outstanding screenshot writes
+            self._io_executor.shutdown(wait=True)
+            
             self.logger.info("Cleanup completed")
         except Exception as e:
             self.logger.error(f"Cleanup failed: {e}")
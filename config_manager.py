@@ -4,19 +4,107 @@ Handles loading and validation of configuration files.
 """
 
 import os
-import yaml
+import copy
 import logging
-from typing import Dict, Any, List
+from functools import cached_property
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Characters that are unsafe in screenshot filenames, mapped to underscores
+_SLUG_TRANS = str.maketrans(' /\\:', '____')
+
+# Fields each step action must provide
+ACTION_REQUIREMENTS = {
+    'navigate': ('url',),
+    'click': ('selector',),
+    'fill_form': ('fields',),
+    'wait_for_element': ('selector',),
+}
+
+# Built-in defaults; treat as read-only and copy before handing out
+_DEFAULT_CONFIG = {
+    'WEB_DRIVER': {
+        'browser': 'chrome',
+        'headless': False,
+        'window_size': [1920, 1080],
+        'implicit_wait': 10,
+        'lightweight_pageload': False
+    },
+    'SCREENSHOTS': {
+        'format': 'png',
+        'quality': 95,
+        'full_page': True,
+        'delay_after_action': 2
+    },
+    'PRESENTATION': {
+        'title': 'User Flow Documentation',
+        'author': 'CaptureBot',
+        'slide_width': 9144000,
+        'slide_height': 6858000
+    },
+    'USER_FLOW': {
+        'login': {
+            'url': 'https://example.com/login',
+            'username_field': 'input[name="username"]',
+            'password_field': 'input[name="password"]',
+            'login_button': 'button[type="submit"]',
+            'username': 'your_username',
+            'password': 'your_password'
+        },
+        'steps': [
+            {
+                'name': 'Login Page',
+                'description': 'Initial login screen',
+                'action': 'navigate',
+                'url': 'https://example.com/login'
+            },
+            {
+                'name': 'Enter Credentials',
+                'description': 'Fill in username and password',
+                'action': 'fill_form',
+                'fields': {
+                    'input[name="username"]': 'your_username',
+                    'input[name="password"]': 'your_password'
+                }
+            },
+            {
+                'name': 'Submit Login',
+                'description': 'Click login button',
+                'action': 'click',
+                'selector': 'button[type="submit"]'
+            },
+            {
+                'name': 'Dashboard',
+                'description': 'Main dashboard after login',
+                'action': 'wait_for_element',
+                'selector': '.dashboard',
+                'timeout': 10
+            }
+        ]
+    }
+}
+
+# ConfigManager properties cached from self.config
+_CACHED_SECTIONS = ('login_config', 'steps', 'web_driver_config', 'screenshot_config', 'presentation_config')
+
 
 class ConfigManager:
     """Manages configuration loading and validation."""
     
+    # Parsed YAML keyed by (abspath, mtime_ns, size), shared across instances
+    _PARSE_CACHE: Dict[tuple, Dict[str, Any]] = {}
+    
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize the configuration manager."""
         self.config_path = config_path
         self.config: Dict[str, Any] = {}
+        self._step_index: Dict[str, Dict[str, Any]] = {}
+        self._step_slugs: Dict[str, str] = {}
         self.logger = logging.getLogger(__name__)
     
     def load_config(self) -> Dict[str, Any]:
@@ -26,12 +114,13 @@ class ConfigManager:
                 self.logger.warning(f"Config file {self.config_path} not found, using defaults")
                 return self._get_default_config()
             
-            with open(self.config_path, 'r', encoding='utf-8') as file:
-                self.config = yaml.safe_load(file) or {}
+            self.config = self._parse_yaml(self.config_path)
             
             # Merge with defaults for missing keys
-            default_config = self._get_default_config()
-            self.config = self._merge_configs(default_config, self.config)
+            # _merge_configs copies the template, so pass it in directly
+            self.config = self._merge_configs(_DEFAULT_CONFIG, self.config)
+            self._build_step_index()
+            self._clear_cached_sections()
             
             self.logger.info(f"Configuration loaded from {self.config_path}")
             return self.config
@@ -41,78 +130,86 @@ class ConfigManager:
             self.logger.info("Using default configuration")
             return self._get_default_config()
     
+    def _build_step_index(self) -> None:
+        """Index steps by name and precompute their filename slugs."""
+        self._step_index = {}
+        self._step_slugs = {}
+        for step in self.config.get('USER_FLOW', {}).get('steps', []):
+            if isinstance(step, dict) and step.get('name'):
+                # Keep the first step with a given name, as a linear scan would
+                self._step_index.setdefault(step['name'], step)
+                self.get_step_slug(step['name'])
+    
+    def _parse_yaml(self, path: str) -> Dict[str, Any]:
+        """Parse a YAML file, reusing a cached result if the file is unchanged."""
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        cached = self._PARSE_CACHE.get(key)
+        if cached is None:
+            cached = self._read_json_sidecar(path, st)
+        if cached is None:
+            import yaml
+            # Prefer the libyaml C loader when PyYAML was built with it
+            loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+            with open(path, 'r', encoding='utf-8') as file:
+                cached = yaml.load(file, Loader=loader) or {}
+            self._write_json_sidecar(path, st, cached)
+        self._PARSE_CACHE[key] = cached
+        # Callers may mutate the result, so never hand out the cached object
+        return copy.deepcopy(cached)
+    
+    def _read_json_sidecar(self, path: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Load the JSON copy of a YAML file if orjson is available and it was made from this exact file."""
+        if orjson is None:
+            return None
+        
+        try:
+            sidecar = orjson.loads(Path(path + '.cache.json').read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        # Compare against the recorded source stat rather than the sidecar's own mtime,
+        # which says nothing about a YAML copied in with an older timestamp
+        if (not isinstance(sidecar, dict)
+                or sidecar.get('mtime_ns') != st.st_mtime_ns
+                or sidecar.get('size') != st.st_size):
+            return None
+        return sidecar.get('config')
+    
+    def _write_json_sidecar(self, path: str, st: os.stat_result, data: Dict[str, Any]) -> None:
+        """Store parsed YAML as JSON next to the source so later runs can skip YAML parsing."""
+        if orjson is None:
+            return
+        
+        sidecar = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'config': data}
+        try:
+            # Dates and other non-JSON values raise TypeError instead of silently becoming strings
+            blob = orjson.dumps(sidecar, option=orjson.OPT_PASSTHROUGH_DATETIME)
+            # NaN and infinity are written as null; NaN != NaN, so this catches both
+            if orjson.loads(blob)['config'] != data:
+                self.logger.debug(f"Not caching {path}: it does not round-trip through JSON")
+                return
+            Path(path + '.cache.json').write_bytes(blob)
+        except (OSError, TypeError) as e:
+            # Not fatal: non-JSON values or a read-only directory just mean no sidecar
+            self.logger.debug(f"Could not write config cache for {path}: {e}")
+    
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration."""
-        return {
-            'WEB_DRIVER': {
-                'browser': 'chrome',
-                'headless': False,
-                'window_size': [1920, 1080],
-                'implicit_wait': 10
-            },
-            'SCREENSHOTS': {
-                'format': 'png',
-                'quality': 95,
-                'full_page': True,
-                'delay_after_action': 2
-            },
-            'PRESENTATION': {
-                'title': 'User Flow Documentation',
-                'author': 'CaptureBot',
-                'slide_width': 9144000,
-                'slide_height': 6858000
-            },
-            'USER_FLOW': {
-                'login': {
-                    'url': 'https://example.com/login',
-                    'username_field': 'input[name="username"]',
-                    'password_field': 'input[name="password"]',
-                    'login_button': 'button[type="submit"]',
-                    'username': 'your_username',
-                    'password': 'your_password'
-                },
-                'steps': [
-                    {
-                        'name': 'Login Page',
-                        'description': 'Initial login screen',
-                        'action': 'navigate',
-                        'url': 'https://example.com/login'
-                    },
-                    {
-                        'name': 'Enter Credentials',
-                        'description': 'Fill in username and password',
-                        'action': 'fill_form',
-                        'fields': {
-                            'input[name="username"]': 'your_username',
-                            'input[name="password"]': 'your_password'
-                        }
-                    },
-                    {
-                        'name': 'Submit Login',
-                        'description': 'Click login button',
-                        'action': 'click',
-                        'selector': 'button[type="submit"]'
-                    },
-                    {
-                        'name': 'Dashboard',
-                        'description': 'Main dashboard after login',
-                        'action': 'wait_for_element',
-                        'selector': '.dashboard',
-                        'timeout': 10
-                    }
-                ]
-            }
-        }
+        return copy.deepcopy(_DEFAULT_CONFIG)
     
     def _merge_configs(self, default: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
         """Merge user configuration with defaults."""
-        result = default.copy()
+        result = copy.deepcopy(default)
         
-        for key, value in user.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_configs(result[key], value)
-            else:
-                result[key] = value
+        # Walk nested mappings with an explicit stack, updating result in place
+        stack = [(result, user)]
+        while stack:
+            dst, src = stack.pop()
+            for key, value in src.items():
+                if isinstance(value, dict) and isinstance(dst.get(key), dict):
+                    stack.append((dst[key], value))
+                else:
+                    dst[key] = value
         
         return result
     
@@ -137,67 +234,104 @@ class ConfigManager:
             errors.append("USER_FLOW.steps cannot be empty")
         
         for i, step in enumerate(steps):
+            label = f"Step {i+1}"
             if not isinstance(step, dict):
-                errors.append(f"Step {i+1} must be a dictionary")
+                errors.append(f"{label} must be a dictionary")
                 continue
             
             if not step.get('name'):
-                errors.append(f"Step {i+1} must have a 'name' field")
+                errors.append(f"{label} must have a 'name' field")
             
-            if not step.get('action'):
-                errors.append(f"Step {i+1} must have an 'action' field")
-            
-            action = step.get('action', '').lower()
-            if action == 'navigate' and not step.get('url'):
-                errors.append(f"Step {i+1} with 'navigate' action must have a 'url' field")
-            
-            elif action == 'click' and not step.get('selector'):
-                errors.append(f"Step {i+1} with 'click' action must have a 'selector' field")
-            
-            elif action == 'fill_form' and not step.get('fields'):
-                errors.append(f"Step {i+1} with 'fill_form' action must have a 'fields' field")
+            action = step.get('action')
+            if not action:
+                errors.append(f"{label} must have an 'action' field")
+                continue
             
-            elif action == 'wait_for_element' and not step.get('selector'):
-                errors.append(f"Step {i+1} with 'wait_for_element' action must have a 'selector' field")
+            action = action.lower()
+            for field in ACTION_REQUIREMENTS.get(action, ()):
+                if not step.get(field):
+                    errors.append(f"{label} with '{action}' action must have a '{field}' field")
         
         return errors
     
     def get_step_by_name(self, name: str) -> Dict[str, Any]:
         """Get a step by its name."""
-        steps = self.config.get('USER_FLOW', {}).get('steps', [])
-        for step in steps:
-            if step.get('name') == name:
-                return step
-        return {}
+        return self._step_index.get(name, {})
+    
+    def get_step_slug(self, name: Optional[str]) -> Optional[str]:
+        """Get the filename slug for a step name, None if the step has no name."""
+        if not name:
+            return None
+        slug = self._step_slugs.get(name)
+        if slug is None:
+            # Steps added after load are slugged on first use
+            slug = self._step_slugs[name] = str(name).translate(_SLUG_TRANS).lower()
+        return slug
+    
+    @cached_property
+    def login_config(self) -> Dict[str, Any]:
+        """Login configuration, cached until the config is reloaded."""
+        return self.config.get('USER_FLOW', {}).get('login', {})
+    
+    @cached_property
+    def steps(self) -> List[Dict[str, Any]]:
+        """User flow steps, cached until the config is reloaded."""
+        return self.config.get('USER_FLOW', {}).get('steps', [])
+    
+    @cached_property
+    def web_driver_config(self) -> Dict[str, Any]:
+        """Web driver configuration, cached until the config is reloaded."""
+        return self.config.get('WEB_DRIVER', {})
+    
+    @cached_property
+    def screenshot_config(self) -> Dict[str, Any]:
+        """Screenshot configuration, cached until the config is reloaded."""
+        return self.config.get('SCREENSHOTS', {})
+    
+    @cached_property
+    def presentation_config(self) -> Dict[str, Any]:
+        """Presentation configuration, cached until the config is reloaded."""
+        return self.config.get('PRESENTATION', {})
+    
+    def _clear_cached_sections(self) -> None:
+        """Drop cached section properties so they are recomputed from self.config."""
+        for name in _CACHED_SECTIONS:
+            self.__dict__.pop(name, None)
     
     def get_login_config(self) -> Dict[str, Any]:
         """Get login configuration."""
-        return self.config.get('USER_FLOW', {}).get('login', {})
+        return self.login_config
     
     def get_steps(self) -> List[Dict[str, Any]]:
         """Get all user flow steps."""
-        return self.config.get('USER_FLOW', {}).get('steps', [])
+        return self.steps
     
     def get_web_driver_config(self) -> Dict[str, Any]:
         """Get web driver configuration."""
-        return self.config.get('WEB_DRIVER', {})
+        return self.web_driver_config
     
     def get_screenshot_config(self) -> Dict[str, Any]:
         """Get screenshot configuration."""
-        return self.config.get('SCREENSHOTS', {})
+        return self.screenshot_config
     
     def get_presentation_config(self) -> Dict[str, Any]:
         """Get presentation configuration."""
-        return self.config.get('PRESENTATION', {})
+        return self.presentation_config
     
     def save_config(self, config: Dict[str, Any] = None) -> None:
         """Save configuration to file."""
         if config is None:
             config = self.config
+            # Steps may have been edited in place since the index was built
+            self._build_step_index()
+            self._clear_cached_sections()
+        
+        import yaml
+        dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
         
         try:
             with open(self.config_path, 'w', encoding='utf-8') as file:
-                yaml.dump(config, file, default_flow_style=False, indent=2)
+                yaml.dump(config, file, Dumper=dumper, default_flow_style=False, indent=2, sort_keys=False)
             self.logger.info(f"Configuration saved to {self.config_path}")
         except Exception as e:
             self.logger.error(f"Failed to save configuration: {e}")
@@ -3,6 +3,7 @@
 Generate PowerPoint from latest screenshots
 """
 
+import heapq
 import os
 from presentation_generator import PresentationGenerator
 
@@ -48,10 +49,11 @@ def main():
     screenshot_dir = 'screenshots'
     
     if os.path.exists(screenshot_dir):
-        screenshot_files = sorted([f for f in os.listdir(screenshot_dir) if f.endswith('.png')])
+        with os.scandir(screenshot_dir) as it:
+            pngs = [e for e in it if e.is_file() and e.name.endswith('.png')]
         # Get the latest 5 screenshots
-        latest_screenshots = screenshot_files[-5:] if len(screenshot_files) >= 5 else screenshot_files
-        screenshots = [os.path.join(screenshot_dir, f) for f in latest_screenshots]
+        latest_screenshots = heapq.nlargest(5, pngs, key=lambda e: e.name)
+        screenshots = [e.path for e in sorted(latest_screenshots, key=lambda e: e.name)]
     
     print(f"Found {len(screenshots)} screenshots")
     
@@ -40,12 +40,13 @@ def main():
     ]
     
     # Get screenshot files
-    screenshots = []
     screenshot_dir = 'screenshots'
     
-    if os.path.exists(screenshot_dir):
-        screenshot_files = sorted([f for f in os.listdir(screenshot_dir) if f.endswith('.png')])
-        screenshots = [os.path.join(screenshot_dir, f) for f in screenshot_files]
+    try:
+        with os.scandir(screenshot_dir) as it:
+            screenshots = sorted(e.path for e in it if e.is_file(follow_symlinks=False) and e.name.endswith('.png'))
+    except FileNotFoundError:
+        screenshots = []
     
     print(f"Found {len(screenshots)} screenshots")
     
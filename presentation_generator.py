@@ -3,15 +3,81 @@ PowerPoint presentation generation module.
 Creates .pptx files with screenshots and documentation.
 """
 
+import io
 import os
+import re
+import struct
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional
+import zipfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
-from PIL import Image
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc import serialized as _pptx_serialized
+from pptx.util import lazyproperty
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# JPEG start-of-frame markers that carry the image dimensions
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Step slide screenshot box, in EMU
+_MAX_PICTURE_WIDTH = Inches(8)
+_MAX_PICTURE_HEIGHT = Inches(5)
+_PICTURE_CENTER_X = Inches(5)
+_PICTURE_CENTER_Y = Inches(2.5)
+_EMU_PER_PX = Inches(1) // 96  # Assuming 96 DPI
+
+# Oversized screenshots are downscaled to this resolution at their on-slide size;
+# twice the 96 DPI layout so text stays sharp on high-DPI displays
+_EMBED_DPI = 192
+# Skip downscaling unless it shrinks the image by more than 10%
+_DOWNSCALE_THRESHOLD = 0.9
+
+# Read size for hashing screenshots on Pythons without hashlib.file_digest
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Threads used to read screenshot headers ahead of slide creation
+_SIZE_PROBE_WORKERS = 8
+
+# Screenshots are already PNG-compressed, so a higher deflate level buys almost nothing
+_ZIP_COMPRESSLEVEL = 1
+_SAVE_BUFFER_SIZE = 1 << 20
+
+# Line breaks and XML-invalid control characters, handled as python-pptx's text setters do
+_LINE_BREAK_RE = re.compile('\n|\v')
+_CTRL_CHAR_RE = re.compile('[\x00-\x08\x0B-\x1F]')
+
+
+@contextlib.contextmanager
+def _fast_zip_deflate() -> Iterator[None]:
+    """Make python-pptx write its zip package with a low deflate level."""
+    writer = getattr(_pptx_serialized, '_ZipPkgWriter', None)
+    if writer is None or '_zipf' not in vars(writer):
+        # Unknown python-pptx internals: save with its defaults
+        yield
+        return
+    
+    original = vars(writer)['_zipf']
+    
+    def _zipf(self):
+        return zipfile.ZipFile(
+            self._pkg_file, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=_ZIP_COMPRESSLEVEL
+        )
+    
+    writer._zipf = lazyproperty(_zipf)
+    try:
+        yield
+    finally:
+        writer._zipf = original
 
 
 class PresentationGenerator:
@@ -22,10 +88,120 @@ class PresentationGenerator:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.prs = None
-        
+        # Image parts already embedded in self.prs, keyed by SHA-256 of the file
+        self._image_part_cache: Dict[bytes, Any] = {}
+        
+    def _fast_image_size(self, path: str) -> Tuple[int, int]:
+        """Read image width and height from the file header without decoding pixels."""
+        with open(path, 'rb') as f:
+            head = f.read(24)
+            if head.startswith(_PNG_SIGNATURE) and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            
+            if head[:2] == b'\xff\xd8':
+                # Walk JPEG segments until a start-of-frame marker
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        break
+                    length_bytes = f.read(2)
+                    if len(length_bytes) < 2:
+                        break
+                    if marker[1] in _JPEG_SOF_MARKERS:
+                        height, width = struct.unpack('>xHH', f.read(5))
+                        return width, height
+                    f.seek(struct.unpack('>H', length_bytes)[0] - 2, os.SEEK_CUR)
+        
+        # Unknown format: let Pillow work it out
+        from PIL import Image
+        with Image.open(path) as img:
+            return img.size
+    
+    def _downscale_image(self, image_path: str, size: Tuple[int, int]) -> io.BytesIO:
+        """Shrink an image to fit within size (pixels), keeping its format."""
+        from PIL import Image
+        
+        with Image.open(image_path) as img:
+            image_format = img.format
+            # Lets JPEG decode at a reduced scale; a no-op for PNG
+            img.draft('RGB', size)
+            img.thumbnail(size, Image.LANCZOS)
+            
+            buffer = io.BytesIO()
+            if image_format == 'JPEG':
+                img.save(buffer, 'JPEG', quality=90)
+            else:
+                img.save(buffer, 'PNG')
+        buffer.seek(0)
+        return buffer
+    
+    def _add_picture(self, slide: Any, image_path: str, left: int, top: int,
+                     width: int, height: int, embed_size: Optional[Tuple[int, int]] = None) -> None:
+        """Add a picture, reusing the image part of an identical earlier screenshot.
+        
+        If embed_size (pixels) is given, the image is downscaled to it before embedding.
+        """
+        with open(image_path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+: hashed by OpenSSL straight from the file
+                digest = hashlib.file_digest(f, 'sha256').digest()
+            else:
+                sha = hashlib.sha256()
+                for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                    sha.update(chunk)
+                digest = sha.digest()
+        
+        image_part = self._image_part_cache.get(digest)
+        if image_part is None:
+            image_file = image_path if embed_size is None else self._downscale_image(image_path, embed_size)
+            image_part, rId = slide.part.get_or_add_image_part(image_file)
+            self._image_part_cache[digest] = image_part
+        else:
+            # Skip python-pptx's re-read and scan of every image part in the package
+            rId = slide.part.relate_to(image_part, RT.IMAGE)
+        
+        pic = slide.shapes._add_pic_from_image_part(image_part, rId, left, top, width, height)
+        # The shared or downscaled part may carry another name; alt text follows this screenshot
+        pic.nvPicPr.cNvPr.set('descr', os.path.basename(image_path))
+        slide.shapes._recalculate_extents()
+    
+    def _probe_image_size(self, path: str) -> Optional[Tuple[int, int]]:
+        """Like _fast_image_size, but return None instead of raising."""
+        try:
+            return self._fast_image_size(path)
+        except Exception:
+            # add_step_slide probes again and reports the error on the slide
+            return None
+    
+    def _append_paragraphs(self, text_frame: Any, lines: List[str], font_size: int,
+                           color: str, space_after: int) -> None:
+        """Append one styled paragraph per line with a single XML parse.
+        
+        Produces the same markup as add_paragraph() with font size (pt), color
+        (hex RGB) and space_after (pt) set, without a proxy round trip per line.
+        """
+        ppr = (
+            f'<a:pPr><a:spcAft><a:spcPts val="{space_after * 100}"/></a:spcAft>'
+            f'<a:defRPr sz="{font_size * 100}"><a:solidFill><a:srgbClr val="{color}"/>'
+            f'</a:solidFill></a:defRPr></a:pPr>'
+        )
+        paragraphs = ''.join(
+            f'<a:p>{ppr}<a:r><a:t>'
+            + '</a:t></a:r><a:br/><a:r><a:t>'.join(
+                escape(_CTRL_CHAR_RE.sub(lambda m: '_x%04X_' % ord(m.group()), part))
+                for part in _LINE_BREAK_RE.split(line)
+            )
+            + '</a:t></a:r></a:p>'
+            for line in lines
+        )
+        container = parse_xml(f'<a:txBody {nsdecls("a")}>{paragraphs}</a:txBody>')
+        text_frame._txBody.extend(list(container))
+    
     def create_presentation(self) -> None:
         """Create a new PowerPoint presentation."""
         self.prs = Presentation()
+        self._image_part_cache = {}
         
         # Set slide dimensions
         slide_width = self.config.get('PRESENTATION', {}).get('slide_width', 9144000)
@@ -94,17 +270,20 @@ class PresentationGenerator:
         content_frame = content_box.text_frame
         content_frame.clear()
         
-        for i, step in enumerate(steps, 1):
-            paragraph = content_frame.add_paragraph()
-            paragraph.text = f"{i}. {step.get('name', 'Unknown Step')}"
-            paragraph.font.size = Pt(18)
-            paragraph.font.color.rgb = RGBColor(51, 51, 51)
-            paragraph.space_after = Pt(12)
+        self._append_paragraphs(
+            content_frame,
+            [f"{i}. {step.get('name', 'Unknown Step')}" for i, step in enumerate(steps, 1)],
+            font_size=18, color='333333', space_after=12
+        )
         
         self.logger.info("Added table of contents slide")
     
-    def add_step_slide(self, step: Dict[str, Any], screenshot_path: str, step_number: int) -> None:
-        """Add a slide for a single step with screenshot."""
+    def add_step_slide(self, step: Dict[str, Any], screenshot_path: str, step_number: int,
+                       size: Optional[Tuple[int, int]] = None) -> None:
+        """Add a slide for a single step with screenshot.
+        
+        size is the screenshot's (width, height) in pixels, if already known.
+        """
         if not self.prs:
             self.create_presentation()
         
@@ -126,25 +305,28 @@ class PresentationGenerator:
         if os.path.exists(screenshot_path):
             try:
                 # Get image dimensions
-                with Image.open(screenshot_path) as img:
-                    img_width, img_height = img.size
+                img_width, img_height = size or self._fast_image_size(screenshot_path)
                 
                 # Calculate scaling to fit in slide
-                max_width = Inches(8)
-                max_height = Inches(5)
+                width_emu = img_width * _EMU_PER_PX
+                height_emu = img_height * _EMU_PER_PX
+                scale = min(_MAX_PICTURE_WIDTH / width_emu, _MAX_PICTURE_HEIGHT / height_emu, 1.0)  # Don't scale up
                 
-                scale_x = max_width / Inches(img_width / 96)  # Assuming 96 DPI
-                scale_y = max_height / Inches(img_height / 96)
-                scale = min(scale_x, scale_y, 1.0)  # Don't scale up
-                
-                scaled_width = Inches(img_width / 96) * scale
-                scaled_height = Inches(img_height / 96) * scale
+                scaled_width = int(width_emu * scale)
+                scaled_height = int(height_emu * scale)
                 
                 # Center the image
-                left = Inches(5) - scaled_width / 2
-                top = Inches(2.5) - scaled_height / 2
+                left = _PICTURE_CENTER_X - scaled_width // 2
+                top = _PICTURE_CENTER_Y - scaled_height // 2
+                
+                # Embed at _EMBED_DPI for the on-slide size rather than full capture resolution
+                embed_size = None
+                embed_width = scaled_width * _EMBED_DPI // Inches(1)
+                embed_height = scaled_height * _EMBED_DPI // Inches(1)
+                if embed_width < img_width * _DOWNSCALE_THRESHOLD:
+                    embed_size = (max(embed_width, 1), max(embed_height, 1))
                 
-                slide.shapes.add_picture(screenshot_path, left, top, scaled_width, scaled_height)
+                self._add_picture(slide, screenshot_path, left, top, scaled_width, scaled_height, embed_size)
                 self.logger.info(f"Added screenshot to slide: {screenshot_path}")
                 
             except Exception as e:
@@ -204,12 +386,11 @@ class PresentationGenerator:
         overview_paragraph.space_after = Pt(12)
         
         # Add step summary
-        for i, step in enumerate(steps, 1):
-            step_paragraph = content_frame.add_paragraph()
-            step_paragraph.text = f"• Step {i}: {step.get('name', 'Unknown Step')}"
-            step_paragraph.font.size = Pt(16)
-            step_paragraph.font.color.rgb = RGBColor(51, 51, 51)
-            step_paragraph.space_after = Pt(8)
+        self._append_paragraphs(
+            content_frame,
+            [f"• Step {i}: {step.get('name', 'Unknown Step')}" for i, step in enumerate(steps, 1)],
+            font_size=16, color='333333', space_after=8
+        )
         
         # Add completion note
         completion_paragraph = content_frame.add_paragraph()
@@ -230,7 +411,8 @@ class PresentationGenerator:
         if not filename.endswith('.pptx'):
             filename += '.pptx'
         
-        self.prs.save(filename)
+        with open(filename, 'wb', buffering=_SAVE_BUFFER_SIZE) as file, _fast_zip_deflate():
+            self.prs.save(file)
         self.logger.info(f"Presentation saved: {filename}")
         return filename
     
@@ -245,9 +427,13 @@ class PresentationGenerator:
         # Add table of contents
         self.add_table_of_contents_slide(steps)
         
+        # Read screenshot sizes in parallel; slide building itself stays single-threaded
+        with ThreadPoolExecutor(max_workers=_SIZE_PROBE_WORKERS) as executor:
+            sizes = list(executor.map(self._probe_image_size, screenshots))
+        
         # Add step slides
         for i, (step, screenshot) in enumerate(zip(steps, screenshots), 1):
-            self.add_step_slide(step, screenshot, i)
+            self.add_step_slide(step, screenshot, i, size=sizes[i-1])
         
         # Add summary slide
         self.add_summary_slide(steps)
@@ -7,15 +7,37 @@ Installs dependencies and creates initial configuration.
 import os
 import sys
 import subprocess
+import importlib
 import yaml
 from pathlib import Path
 
 
+def run_pip(args):
+    """Run pip inside this interpreter, falling back to a pip subprocess."""
+    try:
+        # Private API, so fall back if a pip release moves it
+        from pip._internal.cli.main import main as pip_main
+    except ImportError:
+        subprocess.check_call([sys.executable, "-m", "pip", *args])
+        return
+    
+    exit_code = pip_main(args)
+    if exit_code:
+        raise subprocess.CalledProcessError(exit_code, ["pip", *args])
+    # Let later imports (e.g. check_browser_drivers) see the new packages
+    importlib.invalidate_caches()
+
+
 def install_dependencies():
     """Install required Python packages."""
     print("📦 Installing dependencies...")
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        # Prefer wheels so Pillow/lxml are not compiled from source when a wheel exists
+        run_pip([
+            "install",
+            "--prefer-binary", "--disable-pip-version-check",
+            "-r", "requirements.txt"
+        ])
         print("✅ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -98,8 +120,10 @@ def create_sample_config():
         }
     }
     
+    # Use the libyaml C dumper when PyYAML was built with it
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
     with open('config.yaml', 'w') as f:
-        yaml.dump(sample_config, f, default_flow_style=False, indent=2)
+        yaml.dump(sample_config, f, Dumper=dumper, default_flow_style=False, indent=2, sort_keys=False)
     
     print("✅ Sample configuration created: config.yaml")
 
@@ -3,9 +3,13 @@ Web automation module using Selenium WebDriver.
 Handles browser setup, navigation, and user interactions.
 """
 
-import time
+import io
+import os
+import base64
 import logging
-from typing import Dict, List, Optional, Any
+import functools
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,28 +18,136 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+
+# Seconds between WebDriverWait checks; Selenium's 0.5s default adds dead time on fast pages
+_POLL_FREQUENCY = 0.1
+_WAIT_IGNORED_EXCEPTIONS = (NoSuchElementException,)
+
+# True once the document has loaded and jQuery (if the page uses it) has no requests in flight
+_READY_SCRIPT = "return document.readyState === 'complete' && !(window.jQuery && window.jQuery.active);"
+
+
+def _make_wait(driver: Any, timeout: float) -> WebDriverWait:
+    """Create a WebDriverWait that polls every _POLL_FREQUENCY seconds."""
+    return WebDriverWait(
+        driver, timeout, poll_frequency=_POLL_FREQUENCY, ignored_exceptions=_WAIT_IGNORED_EXCEPTIONS
+    )
+
+
+def _page_ready(driver: Any) -> bool:
+    """WebDriverWait condition for a fully loaded page."""
+    try:
+        return bool(driver.execute_script(_READY_SCRIPT))
+    except WebDriverException:
+        # Scripts can fail while the browser is mid-navigation
+        return False
+
+
+@functools.lru_cache(maxsize=512)
+def _locator(selector: str) -> Tuple[str, str]:
+    """Map a selector to a (By, value) locator: XPath if it starts with '/' or '(/', else CSS."""
+    if selector[:1] == '/' or selector[:2] == '(/':
+        return (By.XPATH, selector)
+    return (By.CSS_SELECTOR, selector)
+
+
+# Fixed scroll scripts; the distance is passed as an argument so the source never changes
+_SCROLL_SCRIPTS = {
+    'down': "window.scrollBy(0, arguments[0]);",
+    'up': "window.scrollBy(0, -arguments[0]);",
+    'top': "window.scrollTo(0, 0);",
+    'bottom': "window.scrollTo(0, document.body.scrollHeight);",
+}
+
+# Sets every [selector, value] pair in one round trip, firing the events frameworks
+# listen for. Uses the native value setter so React-style controlled inputs notice.
+# Only text-like inputs and textareas are set here; returns the selectors that matched
+# nothing or something else, for the caller to fill with send_keys.
+_FILL_FIELDS_SCRIPT = """
+const TEXT_TYPES = new Set(['text', 'search', 'email', 'url', 'tel', 'password', 'number']);
+const missing = [];
+for (const [sel, val] of arguments[0]) {
+    const el = (sel.startsWith('/') || sel.startsWith('(/'))
+        ? document.evaluate(sel, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(sel);
+    let proto;
+    if (el instanceof HTMLInputElement && TEXT_TYPES.has(el.type)) {
+        proto = HTMLInputElement.prototype;
+    } else if (el instanceof HTMLTextAreaElement) {
+        proto = HTMLTextAreaElement.prototype;
+    } else {
+        // Absent, or a file/checkbox/select/contenteditable element that needs real key input
+        missing.push(sel);
+        continue;
+    }
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, val);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return missing;
+"""
 
 
 class WebAutomation:
     """Handles web automation using Selenium WebDriver."""
     
+    # Driver binaries resolved by webdriver-manager, shared by all instances
+    _driver_paths: Dict[str, str] = {}
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize the web automation with configuration."""
         self.config = config
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
         self.logger = logging.getLogger(__name__)
+        # False when driving a tab in a browser owned by someone else
+        self._owns_driver = True
         
+    @classmethod
+    def from_shared(cls, config: Dict[str, Any], driver: Any) -> 'WebAutomation':
+        """Run in a new tab of an already running browser instead of launching one.
+        
+        close() then only closes that tab and leaves the browser running.
+        """
+        automation = cls(config)
+        driver.switch_to.new_window('tab')
+        automation.driver = driver
+        automation.wait = _make_wait(driver, config['WEB_DRIVER']['implicit_wait'])
+        automation._owns_driver = False
+        return automation
+    
+    @classmethod
+    def _get_driver_path(cls, browser: str, manager: Any) -> str:
+        """Resolve a driver binary once per process rather than on every setup."""
+        driver_path = cls._driver_paths.get(browser)
+        if driver_path is None or not os.path.exists(driver_path):
+            driver_path = manager().install()
+            # Fix for webdriver manager issue - use the actual chromedriver file
+            if 'THIRD_PARTY_NOTICES.chromedriver' in driver_path:
+                driver_path = driver_path.replace('THIRD_PARTY_NOTICES.chromedriver', 'chromedriver')
+            cls._driver_paths[browser] = driver_path
+        return driver_path
+    
+    def _add_lightweight_chromium_options(self, options: Any) -> None:
+        """Disable image loading and non-essential features in Chrome/Edge."""
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-features=Translate,MediaRouter')
+        options.add_argument('--disable-extensions')
+    
     def setup_driver(self) -> None:
         """Set up the WebDriver based on configuration."""
+        if self.driver is not None:
+            # Already attached to a browser, e.g. via from_shared()
+            return
+        
         browser = self.config['WEB_DRIVER']['browser'].lower()
         headless = self.config['WEB_DRIVER']['headless']
         window_size = self.config['WEB_DRIVER']['window_size']
         implicit_wait = self.config['WEB_DRIVER']['implicit_wait']
+        # Skip images and browser extras for text/form-focused captures
+        lightweight = self.config['WEB_DRIVER'].get('lightweight_pageload', False)
         
         try:
             if browser == 'chrome':
@@ -45,12 +157,11 @@ class WebAutomation:
                 options.add_argument('--no-sandbox')
                 options.add_argument('--disable-dev-shm-usage')
                 options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+                if lightweight:
+                    self._add_lightweight_chromium_options(options)
                 
-                driver_path = ChromeDriverManager().install()
-                # Fix for webdriver manager issue - use the actual chromedriver file
-                if 'THIRD_PARTY_NOTICES.chromedriver' in driver_path:
-                    driver_path = driver_path.replace('THIRD_PARTY_NOTICES.chromedriver', 'chromedriver')
-                service = ChromeService(driver_path)
+                from webdriver_manager.chrome import ChromeDriverManager
+                service = ChromeService(self._get_driver_path(browser, ChromeDriverManager))
                 self.driver = webdriver.Chrome(service=service, options=options)
                 
             elif browser == 'firefox':
@@ -59,8 +170,11 @@ class WebAutomation:
                     options.add_argument('--headless')
                 options.add_argument(f'--width={window_size[0]}')
                 options.add_argument(f'--height={window_size[1]}')
+                if lightweight:
+                    options.set_preference('permissions.default.image', 2)
                 
-                service = FirefoxService(GeckoDriverManager().install())
+                from webdriver_manager.firefox import GeckoDriverManager
+                service = FirefoxService(self._get_driver_path(browser, GeckoDriverManager))
                 self.driver = webdriver.Firefox(service=service, options=options)
                 
             elif browser == 'edge':
@@ -68,27 +182,39 @@ class WebAutomation:
                 if headless:
                     options.add_argument('--headless')
                 options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+                if lightweight:
+                    self._add_lightweight_chromium_options(options)
                 
-                service = EdgeService(EdgeChromiumDriverManager().install())
+                from webdriver_manager.microsoft import EdgeChromiumDriverManager
+                service = EdgeService(self._get_driver_path(browser, EdgeChromiumDriverManager))
                 self.driver = webdriver.Edge(service=service, options=options)
                 
             else:
                 raise ValueError(f"Unsupported browser: {browser}")
             
             self.driver.implicitly_wait(implicit_wait)
-            self.wait = WebDriverWait(self.driver, implicit_wait)
+            self.wait = _make_wait(self.driver, implicit_wait)
             self.logger.info(f"WebDriver initialized for {browser}")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize WebDriver: {e}")
             raise
     
+    def _wait_ready(self, timeout: Optional[float] = None) -> None:
+        """Wait for the page to settle instead of sleeping for a fixed time."""
+        wait = self.wait if timeout is None else _make_wait(self.driver, timeout)
+        try:
+            wait.until(_page_ready)
+        except TimeoutException:
+            # Best effort: a slow page should not fail the step
+            self.logger.debug("Page still loading, continuing")
+    
     def navigate_to(self, url: str) -> None:
         """Navigate to a specific URL."""
         try:
             self.driver.get(url)
             self.logger.info(f"Navigated to: {url}")
-            time.sleep(2)  # Allow page to load
+            self._wait_ready()
         except Exception as e:
             self.logger.error(f"Failed to navigate to {url}: {e}")
             raise
@@ -96,17 +222,7 @@ class WebAutomation:
     def find_element(self, selector: str, timeout: int = 10) -> Any:
         """Find an element using CSS selector or XPath."""
         try:
-            if selector.startswith('//') or selector.startswith('(//'):
-                # XPath selector
-                element = self.wait.until(
-                    EC.presence_of_element_located((By.XPATH, selector))
-                )
-            else:
-                # CSS selector
-                element = self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-            return element
+            return self.wait.until(EC.presence_of_element_located(_locator(selector)))
         except TimeoutException:
             self.logger.error(f"Element not found: {selector}")
             raise
@@ -120,7 +236,6 @@ class WebAutomation:
             element = self.find_element(selector, timeout)
             # Scroll element into view
             self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(0.5)
             
             # Try regular click first
             try:
@@ -130,7 +245,7 @@ class WebAutomation:
                 self.driver.execute_script("arguments[0].click();", element)
             
             self.logger.info(f"Clicked element: {selector}")
-            time.sleep(1)  # Allow for page changes
+            self._wait_ready()  # Allow for page changes
             
         except Exception as e:
             self.logger.error(f"Failed to click element {selector}: {e}")
@@ -143,15 +258,27 @@ class WebAutomation:
             element.clear()
             element.send_keys(value)
             self.logger.info(f"Filled field {selector} with value: {value}")
-            time.sleep(0.5)
         except Exception as e:
             self.logger.error(f"Failed to fill field {selector}: {e}")
             raise
     
     def fill_form_fields(self, fields: Dict[str, str]) -> None:
         """Fill multiple form fields."""
+        try:
+            missing = self.driver.execute_script(
+                _FILL_FIELDS_SCRIPT, [[selector, str(value)] for selector, value in fields.items()]
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to fill form fields: {e}")
+            raise
+        
+        missing = set(missing or ())
         for selector, value in fields.items():
-            self.fill_form_field(selector, value)
+            if selector in missing:
+                # Not on the page yet or not a plain text box; use the waiting, send_keys path
+                self.fill_form_field(selector, value)
+            else:
+                self.logger.info(f"Filled field {selector} with value: {value}")
     
     def wait_for_element(self, selector: str, timeout: int = 10) -> None:
         """Wait for an element to be present."""
@@ -165,17 +292,12 @@ class WebAutomation:
     def scroll_page(self, direction: str = "down", pixels: int = 500) -> None:
         """Scroll the page."""
         try:
-            if direction == "down":
-                self.driver.execute_script(f"window.scrollBy(0, {pixels});")
-            elif direction == "up":
-                self.driver.execute_script(f"window.scrollBy(0, -{pixels});")
-            elif direction == "top":
-                self.driver.execute_script("window.scrollTo(0, 0);")
-            elif direction == "bottom":
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            script = _SCROLL_SCRIPTS.get(direction)
+            if script:
+                self.driver.execute_script(script, pixels)
             
             self.logger.info(f"Scrolled {direction}")
-            time.sleep(1)
+            self._wait_ready()
         except Exception as e:
             self.logger.error(f"Failed to scroll: {e}")
             raise
@@ -187,7 +309,7 @@ class WebAutomation:
             actions = ActionChains(self.driver)
             actions.move_to_element(element).perform()
             self.logger.info(f"Hovered over element: {selector}")
-            time.sleep(1)
+            self._wait_ready()
         except Exception as e:
             self.logger.error(f"Failed to hover over element {selector}: {e}")
             raise
@@ -246,51 +368,113 @@ class WebAutomation:
             else:
                 raise ValueError(f"Unknown action: {action}")
             
-            # Wait after action for page to stabilize
+            # Wait after action for page to stabilize, at most delay_after_action seconds
             delay = self.config.get('SCREENSHOTS', {}).get('delay_after_action', 2)
-            time.sleep(delay)
+            self._wait_ready(timeout=delay)
             
         except Exception as e:
             self.logger.error(f"Failed to execute step '{name}': {e}")
             raise
     
-    def take_screenshot(self, filename: str) -> str:
-        """Take a screenshot and save it."""
+    def _capture_full_page(self) -> bytes:
+        """Capture the whole page in a single browser call, without scrolling."""
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            # Chrome/Edge: one DevTools capture clipped to the full content size
+            metrics = self.driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+            content = metrics.get('cssContentSize') or metrics['contentSize']
+            result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                "format": "png",
+                "captureBeyondViewport": True,
+                "fromSurface": True,
+                "clip": {
+                    "x": 0,
+                    "y": 0,
+                    "width": content['width'],
+                    "height": content['height'],
+                    "scale": 1
+                }
+            })
+            return base64.b64decode(result['data'])
+        
+        if hasattr(self.driver, 'get_full_page_screenshot_as_png'):
+            # Firefox has native full page screenshots since Selenium 4
+            return self.driver.get_full_page_screenshot_as_png()
+        
+        return self._stitch_viewport_screenshots()
+    
+    def _stitch_viewport_screenshots(self) -> bytes:
+        """Scroll through the page and stitch viewport screenshots into one PNG."""
+        total_height = self.driver.execute_script("return document.body.scrollHeight")
+        viewport_height = self.driver.execute_script("return window.innerHeight")
+        if total_height <= viewport_height:
+            return self.driver.get_screenshot_as_png()
+        
+        from PIL import Image
+        
+        start_y = self.driver.execute_script("return window.scrollY")
+        full = None
+        for offset in range(0, total_height, viewport_height):
+            # The browser clamps the last scroll, so record where it actually landed
+            scroll_y = self.driver.execute_script(
+                "window.scrollTo(0, arguments[0]); return window.scrollY;", offset
+            )
+            # Paste each tile as soon as it arrives so only one is held in memory
+            with Image.open(io.BytesIO(self.driver.get_screenshot_as_png())) as tile:
+                if full is None:
+                    # Screenshots are in device pixels, scroll offsets in CSS pixels
+                    ratio = tile.height / viewport_height
+                    full = Image.new('RGB', (tile.width, round(total_height * ratio)))
+                # paste() copies whole rows in C; overlapping rows are simply overwritten
+                full.paste(tile.convert('RGB'), (0, round(scroll_y * ratio)))
+        self.driver.execute_script("window.scrollTo(0, arguments[0]);", start_y)
+        
+        buffer = io.BytesIO()
+        full.save(buffer, 'PNG', compress_level=3)
+        return buffer.getvalue()
+    
+    def capture_screenshot(self, filename: str) -> Tuple[str, bytes]:
+        """Capture a screenshot as PNG bytes without writing it to disk.
+        
+        The driver is only used on the caller's thread; the caller may write the
+        returned bytes off-thread.
+        """
+        screenshot_path = f"screenshots/{filename}"
         try:
             if self.config.get('SCREENSHOTS', {}).get('full_page', True):
-                # Full page screenshot
-                total_height = self.driver.execute_script("return document.body.scrollHeight")
-                viewport_height = self.driver.execute_script("return window.innerHeight")
-                
-                if total_height > viewport_height:
-                    # Take multiple screenshots and stitch them together
-                    screenshots = []
-                    for i in range(0, total_height, viewport_height):
-                        self.driver.execute_script(f"window.scrollTo(0, {i});")
-                        time.sleep(0.5)
-                        screenshot = self.driver.get_screenshot_as_png()
-                        screenshots.append(screenshot)
-                    
-                    # For now, just take a single screenshot of the current viewport
-                    # In a production version, you'd stitch the screenshots together
-                    screenshot_path = f"screenshots/{filename}"
-                    self.driver.save_screenshot(screenshot_path)
-                else:
-                    screenshot_path = f"screenshots/{filename}"
-                    self.driver.save_screenshot(screenshot_path)
+                data = self._capture_full_page()
             else:
-                screenshot_path = f"screenshots/{filename}"
-                self.driver.save_screenshot(screenshot_path)
+                data = self.driver.get_screenshot_as_png()
             
-            self.logger.info(f"Screenshot saved: {screenshot_path}")
-            return screenshot_path
+            return screenshot_path, data
             
         except Exception as e:
             self.logger.error(f"Failed to take screenshot: {e}")
             raise
     
+    def take_screenshot(self, filename: str) -> str:
+        """Take a screenshot and save it."""
+        screenshot_path, data = self.capture_screenshot(filename)
+        try:
+            Path(screenshot_path).write_bytes(data)
+            self.logger.info(f"Screenshot saved: {screenshot_path}")
+            return screenshot_path
+        except Exception as e:
+            self.logger.error(f"Failed to save screenshot {screenshot_path}: {e}")
+            raise
+    
     def close(self) -> None:
-        """Close the browser."""
+        """Close the browser, or only our tab for a shared one. Safe to call more than once."""
         if self.driver:
-            self.driver.quit()
+            if self._owns_driver:
+                self.driver.quit()
+            else:
+                self.driver.close()
+                # Leave the shared driver pointing at a window that still exists
+                handles = self.driver.window_handles
+                if handles:
+                    self.driver.switch_to.window(handles[0])
+            # Later calls (CaptureBot.run, cleanup) become no-ops
+            self.driver = None
+            self.wait = None
+            self._owns_driver = True
             self.logger.info("Browser closed")